@@ -1,3 +1,6 @@
+import sys
+from functools import lru_cache
+
 from modules.vatsim import Vatsim
 from modules.style import Style
 from modules.table import Table
@@ -26,6 +29,62 @@ def main():
     # Let user know, initalization is complete.
     print(Style.txt_blue('Vatsim data Initalized.\n'))
 
+    # Update timestring of the data the cached tables were made from.
+    last_update_stamp = None
+
+    @lru_cache(maxsize=64)
+    def create_traffic_tables(icao, update_stamp):
+        """
+        Creates the departure and arrival tables
+        for an airport and returns them as strings,
+        along with the number of flights in each.
+        Results are cached per icao and update
+        timestring, so repeated queries against
+        unchanged data are not recreated.
+
+        :param icao: Airport icao
+        :type icao: str
+
+        :param update_stamp: Update timestring of the vatsim data
+        :type update_stamp: str
+
+        :return: Departure table, arrival table, departures and arrivals
+        :rtype: tuple
+        """
+
+        # Get the departures at the desired airport.
+        dep_flights = vsim.get_flights_by_dep(icao=icao)
+
+        # Get the departures at the desired airport.
+        arr_flights = vsim.get_flights_by_dest(icao=icao)
+
+        # Create tables
+        dep_table = Table()
+        arr_table = Table()
+
+        # Set title for table
+        dep_table.title = f"{icao} DEPARTURES"
+        arr_table.title = f"{icao} ARRIVALS"
+
+        # Set head cells for both tables
+        dep_table.head = ['Flight', 'To']
+        arr_table.head = ['Flight', 'From']
+
+        # Create a row for each flight in each table
+        # (flights are already (callsign, airport) pairs)
+        for dep in dep_flights:
+            dep_table.add_row(list(dep))
+        for arr in arr_flights:
+            arr_table.add_row(list(arr))
+
+        # Return finished tables and flight counts
+        return (
+            dep_table.create_string(),
+            arr_table.create_string(),
+            len(dep_flights),
+            len(arr_flights)
+        )
+
     def dialog():
         """
         Prompts user to enter desired airport 
@@ -33,63 +92,51 @@ def main():
         traffic data.
         """
 
-        # Get the user's desired icao.
-        user_icao = input('Enter airport icao (e.g. EGLL) ')
-
-        # If the user's inputted icao is alphanumeric and 
-        # exactly 4 charachters long, continue program.
-        if user_icao.isalnum() and len(user_icao) == 4:
-            # Force icao to upper case. 
-            # (this is the standard in the vatsim dataset)
-            user_icao = user_icao.upper()
+        nonlocal last_update_stamp
 
-            # Let user know this is traffic at their desired airport
-            print(Style.txt_blue(f'Loading traffic at {user_icao}...'))
+        # Ask until the user enters a valid icao.
+        while True:
+            # Get the user's desired icao.
+            user_icao = input('Enter airport icao (e.g. EGLL) ')
 
-            # Get the departures at the desired airport.
-            dep_flights = vsim.get_flights_by_dep(icao=user_icao)
+            # If the user's inputted icao is alphanumeric and 
+            # exactly 4 charachters long, continue program.
+            if user_icao.isalnum() and len(user_icao) == 4:
+                break
 
-            # Get the departures at the desired airport.
-            arr_flights = vsim.get_flights_by_dest(icao=user_icao)
-
-            # Create tables
-            dep_table = Table()
-            arr_table = Table()
+            # Let user know what they did wrong
+            print(Style.txt_yellow('Icao must be alphanumeric and 4 characters long.'))
 
-            # Set title for table
-            dep_table.title = f"{user_icao} DEPARTURES"
-            arr_table.title = f"{user_icao} ARRIVALS"
+        # Force icao to upper case. 
+        # (this is the standard in the vatsim dataset)
+        # Interned, like the icaos in the vatsim indexes.
+        user_icao = sys.intern(user_icao.upper())
 
-            # Set head cells for both tables
-            dep_table.head = ['Flight', 'To']
-            arr_table.head = ['Flight', 'From']
+        # Let user know this is traffic at their desired airport
+        print(Style.txt_blue(f'Loading traffic at {user_icao}...'))
 
-            # Create a row for each flight in each table
-            for dep in dep_flights:
-                dep_table.add_row(
-                    [dep['callsign'], dep['flight_plan']['arrival']]
-                )         
-            for arr in arr_flights:
-                arr_table.add_row(
-                    [arr['callsign'], arr['flight_plan']['departure']]
-                )
+        # Get the timestring of the current data.
+        update_stamp = vsim.get_update_stamp()
 
-            # Render tables to cli
-            dep_table.render()
-            arr_table.render()
+        # Drop cached tables when the data has been updated.
+        if update_stamp != last_update_stamp:
+            create_traffic_tables.cache_clear()
+            last_update_stamp = update_stamp
 
-            # Calculate total number of flights
-            total_flights = len(dep_flights) + len(arr_flights)
+        # Create tables for the desired airport.
+        dep_table, arr_table, num_deps, num_arrs = create_traffic_tables(
+            icao=user_icao, update_stamp=update_stamp
+        )
 
-            # Let user know how many flights there are
-            print(f'{total_flights} flights ({len(dep_flights)} departures and {len(arr_flights)} arrivals)\n')
+        # Render tables to cli
+        print(dep_table)
+        print(arr_table)
 
-        else: 
-            # Let user know what they did wrong
-            print(Style.txt_yellow('Icao must be alphanumeric and 4 characters long.'))
+        # Calculate total number of flights
+        total_flights = num_deps + num_arrs
 
-            # Re-run dialog
-            dialog()
+        # Let user know how many flights there are
+        print(f'{total_flights} flights ({num_deps} departures and {num_arrs} arrivals)\n')
 
     # 3: Repeat forever.
     while True:
@@ -9,10 +9,15 @@ class Style:
     YELLOW = "\u001b[33;1m"  # Color yellow
     BLUE = "\u001b[34;1m"  # Color blue
 
-    @classmethod
-    def txt_yellow(cls, string):
+    # Colored format strings, built once when the
+    # class is loaded, so each call is a single format.
+    YELLOW_FORMAT = YELLOW + "{}" + RESET
+    BLUE_FORMAT = BLUE + "{}" + RESET
+
+    @staticmethod
+    def txt_yellow(string):
         """
-        Make passed string red and 
+        Make passed string yellow and 
         return it.
 
         :param string: String to be colored:
@@ -23,10 +28,11 @@ class Style:
         """
 
         # Color string, reset styling and return string
-        return cls.YELLOW + string + cls.RESET
+        # (any value is accepted, it is formatted with str())
+        return Style.YELLOW_FORMAT.format(string)
 
-    @classmethod
-    def txt_blue(cls, string):
+    @staticmethod
+    def txt_blue(string):
         """
         Make passed string blue and
         return it.
@@ -39,4 +45,5 @@ class Style:
         """
 
         # Color string, reset styling and return string
-        return cls.BLUE + string + cls.RESET
+        # (any value is accepted, it is formatted with str())
+        return Style.BLUE_FORMAT.format(string)
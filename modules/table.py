@@ -1,3 +1,5 @@
+import sys
+
 from modules.style import Style
 
 
@@ -14,8 +16,32 @@ class Table:
         """
 
         self.title = ""
-        self.head = []
         self.rows = []
+        self.head = []
+
+    @property
+    def head(self):
+        """
+        List of head cells.
+        """
+
+        return self.__head
+
+    @head.setter
+    def head(self, head):
+        """
+        Sets the head cells and updates
+        the width of the widest cell.
+
+        :param head: List of cells
+        :type head: list
+        """
+
+        self.__head = head
+
+        # Rescan all cells, since the old head
+        # could have been the widest.
+        self.__cell_width = len(self.__find_widest_cell())
 
     def add_row(self, row):
         """
@@ -28,110 +54,138 @@ class Table:
         # Append passed row to rows list.
         self.rows.append(row)
 
+        # Keep track of the widest cell.
+        self.__cell_width = max(self.__cell_width, len(max(row, key=len, default="")))
+
     def __find_widest_cell(self):
         """
         Finds the widest cell in all
         cells and returns it.
         """
 
-        # Create a list to hold the widest cells.
-        lgst_cells = list()
+        # Return the widest cell of the head and all rows,
+        # or an empty string if there are no cells.
+        return max(
+            (cell for row in (self.head, *self.rows) for cell in row),
+            key=len,
+            default=""
+        )
+
+    def __create_row_format(self):
+        """
+        Builds a responsive format string for
+        a table row, with a cell width of the 
+        widest cell. Built once per render and 
+        reused for every row.
+        """
 
-        # Append widest head cell.
-        lgst_cells.append(sorted(self.head, key=len)[-1])
+        # Get the width of the widest cell.
+        global_cell_width = str(self.__cell_width)
 
-        # Loop through rows.
-        for row in self.rows:
-            # Append widest row cell.
-            lgst_cells.append(sorted(row, key=len)[-1])
+        # Format for a single cell.
+        cell_format = "{:<" + global_cell_width + "}"
 
-        # Return the widest of the widest cells.
-        return sorted(lgst_cells, key=len)[-1]   
+        # Join one cell format per column with "|" separators,
+        # starting and ending the row with a "|".
+        return "| " + " | ".join([cell_format] * len(self.head)) + " |"
 
-    def __create_formatted_row(self, row):
-        """
-        Generates the code for a responsive 
-        format string, executes it, and returns 
-        the formatted string. The string is 
-        formatted as a table row with a row width
-        of the widest cell.
+    def __create_formatted_row(self, row, row_format):
         """
+        Formats a row using the passed row 
+        format string and returns it.
 
-        # Get the widest cell.
-        global_cell_width = str(len(self.__find_widest_cell()))
+        :param row: List of cells
+        :type row: list
 
-        # Splitting code into parts at ".".
-        # => string.format() where the string is part 1
-        #    and format() is part 2.
+        :param row_format: Format string made by __create_row_format
+        :type row_format: str
 
-        # Start of both parts
-        string_part1 = "'"
-        string_part2 = "format("
+        :return: Formatted row
+        :rtype: str
+        """
 
-        # Piece together both parts.
+        # Feed the cell values to the format string
+        return row_format.format(*row)
 
-        for i, cell in enumerate(row):
-            # If last cell
-            if i == (len(row) - 1):
-                # Make string so it ends with a "|", 
-                # Works as the end of a table row.
-                string_part1 += "| {:<" + global_cell_width + "} |"
+    def __create_formatted_2col_row(self, cell_a, cell_b, width):
+        """
+        Formats a row with exactly two cells and 
+        returns it. A faster, specialized version of
+        __create_formatted_row, for two column tables.
 
-                # Feed the cell value to the format string
-                string_part2 += f"'{cell}'"
+        :param cell_a: First cell
+        :type cell_a: str
 
-            else:
-                # Make string so it starts with a "|".
-                # Works as the beginning of a table row,
-                # and as a separater between cells.
-                string_part1 += "| {:<" + global_cell_width + "} "
+        :param cell_b: Second cell
+        :type cell_b: str
 
-                # Feed the cell value to the format string
-                string_part2 += f"'{cell}',"
+        :param width: Cell width
+        :type width: int
 
-        # End of both parts
-        string_part1 += "'"
-        string_part2 += ")"
+        :return: Formatted row
+        :rtype: str
+        """
 
-        # Execute formatting and return formatted string
-        return eval(f'{string_part1}.{string_part2}')
+        return f"| {cell_a:<{width}} | {cell_b:<{width}} |"
 
-    def render(self):
+    def create_string(self):
         """
-        Print finished table object to
-        the command line.
+        Creates the finished table as
+        a string and returns it.
+
+        :return: Table string
+        :rtype: str
         """
 
-        # Get a formatted string of the head row.
-        head_string = self.__create_formatted_row(row=self.head)
+        # Tables with two columns (like the traffic tables)
+        # use the specialized two column row format, if
+        # every row has exactly two cells as well.
+        if len(self.head) == 2 and all(len(row) == 2 for row in self.rows):
+            width = self.__cell_width
+
+            # Get a formatted string of the head row.
+            head_string = self.__create_formatted_2col_row(*self.head, width)
+
+            # Format each flight row.
+            row_strings = [self.__create_formatted_2col_row(a, b, width) for a, b in self.rows]
 
-        # Start with empty divider line.
-        line = ""
+        else:
+            # Build the row format string once for all rows.
+            row_format = self.__create_row_format()
 
-        # Index start at 0.
-        i = 0
+            # Get a formatted string of the head row.
+            head_string = self.__create_formatted_row(row=self.head, row_format=row_format)
+
+            # Format each flight row.
+            row_strings = [self.__create_formatted_row(row=row, row_format=row_format) for row in self.rows]
 
         # Generate a responsive divider line 
         # based on the head width.
-        while i < len(head_string):
-            line += "-"  # Add a dash.
-            i += 1  # Increment index.
-            
-        # Create table head by combining divider lines 
-        # with the formatted head string.
-        head = f"{Style.txt_yellow(self.title)}\n{line}\n{head_string}\n{line}"
-    
-        # Start with empty body.
-        body = ""
-
-        # Loop through rows
-        for i, row in enumerate(self.rows):
-            # Add each formatted flight string to body
-            body += "\n" + self.__create_formatted_row(row=row)
-
-        # Create entire table by combining 
-        # head, body and a divider line
-        table = f"\n{head}{body}\n{line}\n"
-
-        # Print table to command line
-        print(table)
+        line = "-" * len(head_string)
+
+        # Start the table with a yellow title and
+        # the head string between two divider lines.
+        parts = [
+            "\n", Style.YELLOW, self.title, Style.RESET, "\n",
+            line, "\n", head_string, "\n", line
+        ]
+
+        # Join the rows into the body, each on its own line.
+        # (no body if there are no rows)
+        if row_strings:
+            parts.append("\n" + "\n".join(row_strings))
+
+        # End the table with a divider line.
+        parts += ["\n", line, "\n"]
+
+        # Create entire table by joining all parts at once.
+        return "".join(parts)
+
+    def render(self):
+        """
+        Print finished table object to
+        the command line.
+        """
+
+        # Write table to command line
+        sys.stdout.write(self.create_string() + "\n")
@@ -1,10 +1,22 @@
 import urllib.request
 import urllib.error
+import gzip
 import json
 import logging
 import os
+import sys
+import threading
+import time
+import zlib
 from datetime import datetime
 
+# Use the faster orjson parser if it is installed,
+# otherwise fall back to the standard json parser.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 
 class Vatsim:
     """
@@ -33,7 +45,8 @@ class Vatsim:
         # URLs and paths to the vatsim data
         self.live_data_url = "https://data.vatsim.net/v3/vatsim-data.json"
         self.test_data_path = "data/vatsim-data.json"
-        self.cached_data_path = "cache/vatsim.json"
+        self.cached_data_path = "cache/vatsim.json.gz"
+        self.cached_meta_path = "cache/vatsim.meta.json"
 
         # Save local mode boolean for later referance
         self.local_mode = local_mode
@@ -44,6 +57,25 @@ class Vatsim:
         # This fix tries to prevent fetching old data.
         self.update_delay = .5
 
+        # Number of sec to trust the last outdated check.
+        # Several get methods are called per user query,
+        # so there is no need to check the data every time.
+        self.check_interval = 1
+
+        # Number of min past the update interval, before outdated
+        # data is too old to show while new data is fetched in the
+        # background. Older data than this is refreshed right away.
+        self.stale_limit = 10
+
+        # Datetime of when the current data was last updated (utc time),
+        # and the number of min between data updates.
+        self.update_time = None
+        self.reload = None
+
+        # Monotonic time of the last outdated check.
+        # (none until the first check)
+        self.last_check_time = None
+
         # If debug mode is passed as true, turn on debug in logging. 
         # (activates all levels of logging debug->critical)
         # (default warning->critical)
@@ -54,6 +86,40 @@ class Vatsim:
         # This dict will be manipulated by the various core methods.
         self.vatsim_data = {}
 
+        # Callsign, departure and destination of every flight
+        # with a flight plan, stored as parallel lists (columns).
+        self.flight_columns = {'callsign': [], 'dep': [], 'dest': []}
+
+        # Indexes of flights keyed by departure and destination
+        # airport icao (always upper case, so lookups must be too).
+        # Each flight is a position in flight_columns.
+        # Rebuilt every time new data is stored in vatsim_data,
+        # so lookups don't have to scan all pilots.
+        self.dep_index = {}
+        self.dest_index = {}
+
+        # Validators from the last live data response.
+        # Sent back on the next fetch, so the data is only
+        # downloaded again if it has actually changed.
+        self.etag = None
+        self.last_modified = None
+
+        # Path of cached data that is not loaded yet.
+        # The cache is only parsed when the data is first
+        # needed, and not at all if it is replaced first.
+        self.cache_path_to_load = None
+
+        # New live data can be fetched in a background thread.
+        # The lock guards swapping in the new data and indexes,
+        # so readers never see a mix of old and new data.
+        # (reentrant, since loading the cache holds it too)
+        self.refresh_lock = threading.RLock()
+        self.refreshing = False
+
+        # Both the background thread and the main thread can
+        # cache data, so writing the cache is done one at a time.
+        self.cache_lock = threading.Lock()
+
         # Check if cached data exists on instance creation.
         self.__is_data_cached()
 
@@ -70,24 +136,57 @@ class Vatsim:
     def __is_data_cached(self):
         """
         Checks if the cached data file exists. If true,
-        cached data is retrived. If not, local test data
-        or new data is fetched, depending on the boolean
-        state of local_mode.
+        cached data is retrived, or deferred until first
+        needed if its meta file tells when it was updated.
+        If not, local test data or new data is fetched,
+        depending on the boolean state of local_mode.
         """
 
         # Check if cache file exists
         if os.path.exists(self.cached_data_path):
             # A debug message for easier development.
             logging.debug('Data is cached')
-            logging.debug('Fetching cached data')
 
-            # Fetch local cached data
-            self.__fetch_local_data(path=self.cached_data_path)
+            # Fetch validators and update info of the cached data
+            self.__fetch_cache_meta()
 
-        # If local_mode is true, fetch local test data instead.
-        elif self.local_mode:
+            # If the update info is known, the outdated check
+            # can run without the data, so defer loading it.
+            if self.update_time:
+                # A debug message for easier development.
+                logging.debug('Deferring cached data')
+
+                self.cache_path_to_load = self.cached_data_path
+
+            else:
+                # A debug message for easier development.
+                logging.debug('Fetching cached data')
+
+                # Fetch local cached data
+                self.__fetch_local_data(path=self.cached_data_path)
+
+                # Cached data could not be loaded (e.g. corrupt),
+                # get data like when there is no cache.
+                if not self.vatsim_data:
+                    self.__fetch_uncached_data()
+
+        else:
             # A debug message for easier development.
             logging.debug('Data is not cached')
+
+            # Fetch local test data or new live data
+            self.__fetch_uncached_data()
+
+    def __fetch_uncached_data(self):
+        """
+        Fetches data without the cache. Local test
+        data or new data is fetched, depending on
+        the boolean state of local_mode.
+        """
+
+        # If local_mode is true, fetch local test data instead.
+        if self.local_mode:
+            # A debug message for easier development.
             logging.debug('Fetching local test data')
 
             # Fetch local test data
@@ -95,7 +194,6 @@ class Vatsim:
 
         else:
             # A debug message for easier development.
-            logging.debug('Data is not cached')
             logging.debug('Fetching new live data')
             
             # Fetch new live data
@@ -108,32 +206,51 @@ class Vatsim:
         depending on the boolean state of local_mode. 
         """
 
-        # Get the timestring of the current data was updated (utc time).
-        last_update_timestring = self.vatsim_data['general']['update']
+        # Get the time of this check.
+        check_time = time.monotonic()
 
-        # Get the current update interval.
-        update_interval = self.vatsim_data['general']['reload'] + self.update_delay
+        # Skip the check if the data was just checked.
+        if self.last_check_time is not None and check_time - self.last_check_time < self.check_interval:
+            return
 
-        # Get current datetime in (utc time).
-        time_now = datetime.utcnow()
+        self.last_check_time = check_time
 
-        # Convert timestring to a datetime (Format: YYYYMMDDhhmmss).
-        time_then = datetime.strptime(last_update_timestring, "%Y%m%d%H%M%S")
+        with self.refresh_lock:
+            # Get the current update interval.
+            update_interval = self.reload + self.update_delay
 
-        # Calculate diff between now and the last update
-        # in minutes.
-        time_diff = time_now - time_then
-        time_diff = time_diff.total_seconds() / 60
+            # Get current datetime in (utc time).
+            time_now = datetime.utcnow()
+
+            # Calculate diff between now and the last update
+            # in minutes.
+            time_diff = time_now - self.update_time
+            time_diff = time_diff.total_seconds() / 60
         
         # If differance is greater then the update interval,
         # fetch new live data.
         if time_diff > update_interval and not self.local_mode:
             # A debug message for easier development.
             logging.debug('Data is outdated')
-            logging.debug('Fetching new live data')
 
-            # Fetch new live data
-            self.__fetch_new_data()
+            # New data is already on its way.
+            if self.refreshing:
+                logging.debug('Data is being refreshed')
+
+            # Data is too old to show, wait for new live data.
+            elif time_diff > update_interval + self.stale_limit:
+                logging.debug('Fetching new live data')
+
+                # Fetch new live data
+                self.__fetch_new_data()
+
+            else:
+                logging.debug('Fetching new live data in background')
+
+                # Fetch new live data in a background thread,
+                # and keep showing the current data meanwhile.
+                self.refreshing = True
+                threading.Thread(target=self.__refresh_data, daemon=True).start()
         
         # If local mode is true as well, fetch local test data.
         elif time_diff > update_interval and self.local_mode:
@@ -160,83 +277,260 @@ class Vatsim:
         :type path: str
         """
 
+        # Compressed files (like the cache) are opened with gzip.
+        open_file = gzip.open if path.endswith('.gz') else open
+
         try:
             # Load and parse local data file
-            with open(path) as file:
-                parsed_json = json.load(file)
+            with open_file(path, 'rb') as file:
+                raw_data = file.read()
+                parsed_json = json_loads(raw_data)
 
         except FileNotFoundError as e:
             # Log error with tip
             logging.error(f'{e}\n- Please check path')
 
+        except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+            # Log error with tip
+            logging.error(f'{e}\n- Data is not valid gzip')
+
         except json.JSONDecodeError as e:
             # Log error with tip
             logging.error(f'{e}\n- Data is not valid json')
 
         else:
-            # A debug message for easier development.
-            logging.debug('Copying data to self.vatsim_data')
+            # Swap in the new data and indexes at once.
+            with self.refresh_lock:
+                # A debug message for easier development.
+                logging.debug('Copying data to self.vatsim_data')
 
-            # Save parsed data in vatsim_data
-            self.vatsim_data = parsed_json
+                # Save parsed data in vatsim_data
+                self.vatsim_data = parsed_json
 
-            # A debug message for easier development.
-            logging.debug('Caching data')
+                # A debug message for easier development.
+                logging.debug('Building flight indexes')
 
-            # Cache gotten data
-            self.__cache_data()
+                # Index flights by departure and destination
+                self.__build_indexes()
+
+                # Parse when the data was last updated
+                self.__parse_update_info(general=self.vatsim_data['general'])
+
+                # Cached data is replaced, no need to load it.
+                self.cache_path_to_load = None
+
+            # Data from any other file than the cache is not
+            # live data, so its validators no longer apply.
+            # (the cache itself needs no re-caching)
+            if path != self.cached_data_path:
+                self.etag = None
+                self.last_modified = None
 
-    def __fetch_new_data(self):
+                # A debug message for easier development.
+                logging.debug('Caching data')
+
+                # Cache gotten data
+                self.__cache_data(raw_data=raw_data, general=parsed_json['general'])
+
+    def __fetch_new_data(self, fail_safe=True):
         """
         Fetches live vatsim data from
         live_data_url and caches it. 
 
         Data is also stored in the 
         vatsim_data variable.
+
+        :param fail_safe: Switch to local mode on http or connection errors, instead of keeping the current data
+        :type fail_safe: bool
         """
 
+        # Only ask for the data if it has changed,
+        # when there is data to fall back on.
+        # (loaded or still waiting in the cache)
+        headers = {}
+
+        if self.vatsim_data or self.cache_path_to_load:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+
+        req = urllib.request.Request(self.live_data_url, headers=headers)
+
         try:
             # Request and parse live data file
-            with urllib.request.urlopen(self.live_data_url) as res:
-                parsed_json = json.load(res)
+            with urllib.request.urlopen(req) as res:
+                raw_data = res.read()
+                parsed_json = json_loads(raw_data)
+
+                # Save validators for the next request
+                self.etag = res.headers.get('ETag')
+                self.last_modified = res.headers.get('Last-Modified')
 
         except urllib.error.HTTPError as e:
-            # Log error with tip
-            logging.error(f'{e}\n- Please check url')
+            # Data has not changed since the last fetch,
+            # keep the current data.
+            if e.code == 304:
+                # A debug message for easier development.
+                logging.debug('Data is not modified')
 
-            # Run fail safe
-            self.__fail_safe()
+            else:
+                # Log error with tip
+                logging.error(f'{e}\n- Please check url')
+
+                # Run fail safe, or keep the current data
+                self.__keep_or_fail_safe(fail_safe=fail_safe)
 
         except urllib.error.URLError as e:
             # Log error with tip
             logging.error(f'{e}\n- Please check internet connection')
 
-            # Run fail safe
-            self.__fail_safe()
+            # Run fail safe, or keep the current data
+            self.__keep_or_fail_safe(fail_safe=fail_safe)
 
         else:
-            # A debug message for easier development.
-            logging.debug('Copying data to self.vatsim_data')
+            # Swap in the new data and indexes at once.
+            with self.refresh_lock:
+                # A debug message for easier development.
+                logging.debug('Copying data to self.vatsim_data')
+
+                # Save parsed data in vatsim_data
+                self.vatsim_data = parsed_json
+
+                # A debug message for easier development.
+                logging.debug('Building flight indexes')
+
+                # Index flights by departure and destination
+                self.__build_indexes()
 
-            # Save parsed data in vatsim_data
-            self.vatsim_data = parsed_json
+                # Parse when the data was last updated
+                self.__parse_update_info(general=self.vatsim_data['general'])
+
+                # Cached data is replaced, no need to load it.
+                self.cache_path_to_load = None
 
             # A debug message for easier development.
             logging.debug('Caching data')
 
             # Cache gotten data
-            self.__cache_data()
+            self.__cache_data(raw_data=raw_data, general=parsed_json['general'])
 
-    def __cache_data(self):
+    def __refresh_data(self):
+        """
+        Fetches new live data. Intended to be
+        run in a background thread.
+        """
+
+        try:
+            # Fetch new live data. If this fails, keep
+            # showing the current data instead of
+            # switching to local test data.
+            self.__fetch_new_data(fail_safe=False)
+
+        finally:
+            # Allow the next refresh.
+            self.refreshing = False
+
+    def __build_indexes(self):
+        """
+        Collects all flights with a flight plan into
+        flight_columns and indexes them by departure
+        and destination airport icao, in a single pass
+        over the pilots in vatsim_data.
+        """
+
+        # Start with empty columns and indexes.
+        callsigns = []
+        deps = []
+        dests = []
+        self.dep_index = {}
+        self.dest_index = {}
+
+        for flight in self.vatsim_data['pilots']:
+            flight_plan = flight.get('flight_plan')
+
+            # Skip flights without a flight plan.
+            if flight_plan:
+                # Force icaos to upper case, incase the data has
+                # mixed case, and intern them, so equal icaos are the
+                # same string object (fast key compares, one copy per airport).
+                dep = sys.intern(flight_plan['departure'].upper())
+                dest = sys.intern(flight_plan['arrival'].upper())
+
+                # Position of the flight in the columns.
+                i = len(callsigns)
+
+                callsigns.append(flight['callsign'])
+                deps.append(dep)
+                dests.append(dest)
+
+                self.dep_index.setdefault(dep, []).append(i)
+                self.dest_index.setdefault(dest, []).append(i)
+
+        self.flight_columns = {'callsign': callsigns, 'dep': deps, 'dest': dests}
+
+    def __parse_update_info(self, general):
+        """
+        Converts the timestring of when the vatsim
+        data was last updated to a datetime, once
+        per fetch, and stores it in update_time, 
+        along with the update interval in reload.
+
+        :param general: The general section of the vatsim data
+        :type general: dict
+        """
+
+        # Get the update interval (min).
+        self.reload = general['reload']
+
+        # Get the timestring of the current data was updated (utc time).
+        s = general['update']
+
+        # Convert timestring to a datetime (Format: YYYYMMDDhhmmss).
+        # (slicing is a lot faster than datetime.strptime)
+        self.update_time = datetime(
+            int(s[0:4]), int(s[4:6]), int(s[6:8]),
+            int(s[8:10]), int(s[10:12]), int(s[12:14])
+        )
+
+    def __cache_data(self, raw_data, general):
         """
         Stores the vatsim data to the
         cache file at cached_data_path.
+
+        The raw json bytes, as they were fetched,
+        are stored, so the data does not have to 
+        be serialized again.
+
+        :param raw_data: Raw json bytes of the vatsim data
+        :type raw_data: bytes
+
+        :param general: The general section of the same data
+        :type general: dict
         """
 
+        # Validators and update info of the data.
+        # (update info is passed along with the data, since
+        # vatsim_data could already be swapped by another thread)
+        meta = {
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'general': {
+                'update': general['update'],
+                'reload': general['reload']
+            }
+        }
+
         try:
-            # Write vatsim data to cache file
-            with open(self.cached_data_path, 'w') as file:
-                json.dump(self.vatsim_data, file)
+            # Write one cache at a time, so the cache
+            # and meta file always belong together.
+            with self.cache_lock:
+                # Write compressed vatsim data to cache file
+                self.__write_file(path=self.cached_data_path, data=raw_data, compress=True)
+
+                # Write validators and update info of the data to meta file
+                self.__write_file(path=self.cached_meta_path, data=json.dumps(meta).encode())
 
         except FileNotFoundError as e:
             # Log error with tip
@@ -246,6 +540,115 @@ class Vatsim:
             # Log error with tip
             logging.error(f'{e}\n- Data is not valid json')
 
+    def __write_file(self, path, data, compress=False):
+        """
+        Writes data to a temp file next to the passed
+        path, and moves it into place. The file at path
+        is then either fully old or fully new, even if
+        writing is interrupted (e.g. the background
+        thread is killed when the program exits).
+
+        :param path: Local path to file
+        :type path: str
+
+        :param data: Data to write
+        :type data: bytes
+
+        :param compress: Compress data with gzip
+        :type compress: bool
+        """
+
+        # Temp file in the same folder, so it can be moved into
+        # place in one step. Named after the process and thread,
+        # so writers never share it, and created with plain open,
+        # so it gets the default file mode (unlike tempfile.mkstemp).
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        try:
+            # Compress with the lowest level,
+            # the goal is less i/o, not the best ratio.
+            if compress:
+                with gzip.open(temp_path, 'wb', compresslevel=1) as file:
+                    file.write(data)
+
+            else:
+                with open(temp_path, 'wb') as file:
+                    file.write(data)
+
+            # Replace the old file with the new one.
+            os.replace(temp_path, path)
+
+        except OSError:
+            # Don't leave the temp file behind.
+            # (it is not there if it could not be created)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def __fetch_cache_meta(self):
+        """
+        Fetches the validators and update info of
+        the cached data from the meta file at
+        cached_meta_path.
+        """
+
+        try:
+            # Load and parse meta file
+            with open(self.cached_meta_path) as file:
+                meta = json.load(file)
+
+        except FileNotFoundError as e:
+            # A debug message for easier development.
+            logging.debug(f'{e}\n- Cache has no meta file')
+
+        except json.JSONDecodeError as e:
+            # Log error with tip
+            logging.error(f'{e}\n- Data is not valid json')
+
+        else:
+            # Save validators for the next request
+            self.etag = meta.get('etag')
+            self.last_modified = meta.get('last_modified')
+
+            # Parse when the cached data was last updated
+            # (older meta files have no update info)
+            if 'general' in meta:
+                self.__parse_update_info(general=meta['general'])
+
+    def __ensure_loaded(self):
+        """
+        Loads the cached data, if loading
+        it was deferred and it has not been
+        replaced by newer data since.
+        """
+
+        # Hold the lock, so a background refresh can't
+        # be overwritten by the older cached data.
+        with self.refresh_lock:
+            if self.cache_path_to_load:
+                # A debug message for easier development.
+                logging.debug('Fetching cached data')
+
+                # Fetch local cached data
+                self.__fetch_local_data(path=self.cache_path_to_load)
+
+                # Cached data could not be loaded (e.g. corrupt).
+                # (a successful load clears cache_path_to_load)
+                if self.cache_path_to_load:
+                    # Log warning
+                    logging.warning('Cached data could not be loaded')
+
+                    # Forget the cache and the info from its meta file.
+                    self.cache_path_to_load = None
+                    self.update_time = None
+                    self.reload = None
+                    self.etag = None
+                    self.last_modified = None
+
+                    # Get data like when there is no cache,
+                    # instead of serving no data at all.
+                    self.__fetch_uncached_data()
+
     """
     GET METHODs
 
@@ -266,18 +669,40 @@ class Vatsim:
         # (always do this, incase method is called by itself)
         self.__is_data_outdated()
 
+        # Load cached data, if not done yet
+        self.__ensure_loaded()
+
         # Return all the pilots on the network
         return self.vatsim_data['pilots']
 
+    def get_update_stamp(self):
+        """
+        Gets the timestring of when the
+        vatsim data was last updated.
+
+        :return: Update timestring (Format: YYYYMMDDhhmmss)
+        :rtype: str
+        """
+
+        # Check if vatsim data is outdated
+        # (always do this, incase method is called by itself)
+        self.__is_data_outdated()
+
+        # Load cached data, if not done yet
+        self.__ensure_loaded()
+
+        # Return the update timestring
+        return self.vatsim_data['general']['update']
+
     def get_flights_by_dep(self, icao):
         """
         Gets a list of flights based on its 
         departure airport icao code.
 
-        :param icao: Dest airport icao
+        :param icao: Dep airport icao (upper case)
         :type icao: str
 
-        :return: A list of flights. Empty list if no flights were found
+        :return: A list of (callsign, dest icao) tuples. Empty list if no flights were found
         :rtype: list
         """
 
@@ -285,29 +710,27 @@ class Vatsim:
         # (always do this, incase method is called by itself)
         self.__is_data_outdated()
 
-        # Get all flights on the network
-        flights = self.get_flights()
-
-        # Find all flights departing the specified airport
-        departures = []
+        # Load cached data, if not done yet
+        self.__ensure_loaded()
 
-        for flight in flights:
-            if flight['flight_plan']:
-                if flight['flight_plan']['departure'] == icao:
-                    departures.append(flight)
+        # Read columns and index from the same data.
+        with self.refresh_lock:
+            callsigns = self.flight_columns['callsign']
+            dests = self.flight_columns['dest']
+            positions = self.dep_index.get(icao, [])
 
-        # Return departing flights
-        return departures
+        # Look up all flights departing the specified airport
+        return [(callsigns[i], dests[i]) for i in positions]
 
     def get_flights_by_dest(self, icao):
         """
         Gets a list of flights based on its 
         destination airport icao code.
 
-        :param icao: Dest airport icao
+        :param icao: Dest airport icao (upper case)
         :type icao: str
 
-        :return: A list of flights. Empty list if no flights were found
+        :return: A list of (callsign, dep icao) tuples. Empty list if no flights were found
         :rtype: list
         """
 
@@ -315,19 +738,17 @@ class Vatsim:
         # (always do this, incase method is called by itself)
         self.__is_data_outdated()
 
-        # Get all flights on the network
-        flights = self.get_flights()
+        # Load cached data, if not done yet
+        self.__ensure_loaded()
 
-        # Find all flights arriving at the specified airport
-        arrivals = []
+        # Read columns and index from the same data.
+        with self.refresh_lock:
+            callsigns = self.flight_columns['callsign']
+            deps = self.flight_columns['dep']
+            positions = self.dest_index.get(icao, [])
 
-        for flight in flights:
-            if flight['flight_plan']:
-                if flight['flight_plan']['arrival'] == icao:
-                    arrivals.append(flight)
-
-        # Return arriving flights
-        return arrivals
+        # Look up all flights arriving at the specified airport
+        return [(callsigns[i], deps[i]) for i in positions]
 
     """
     EXTRA METHODs
@@ -335,6 +756,23 @@ class Vatsim:
     ...
     """
 
+    def __keep_or_fail_safe(self, fail_safe):
+        """
+        Runs the fail safe after a failed fetch of
+        new live data, or keeps the current data.
+
+        :param fail_safe: Run the fail safe
+        :type fail_safe: bool
+        """
+
+        if fail_safe:
+            # Run fail safe
+            self.__fail_safe()
+
+        else:
+            # Let the user know the data was not refreshed.
+            logging.warning('Keeping current data')
+
     def __fail_safe(self):
         """
         An extra method for switching to local_mode if